@@ -2,44 +2,104 @@
 import yfinance as yf
 import pandas as pd
 import time
-from typing import Dict, List, Optional
+from collections.abc import Mapping
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, Iterator, List, Optional
 from datetime import datetime, timedelta
 import streamlit as st
 import database.models as db
 from config import constants
 import os
 
-# Debug toggle for step-by-step metric calculations
-DEBUG_STOCKS = True
+# Arrow IPC lets the MongoDB cache keep the 'historical' frame; optional
+try:
+    import pyarrow as pa
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
 
-# Simple debug printer
-def _dbg(msg: str):
+# Resolved once at import so the per-ticker hot paths skip the module lookups
+_HK_STOCKS = tuple(constants.HK_STOCKS)
+_STOCK_NAME_TABLE = dict(constants.STOCK_NAMES)
+
+# Debug toggle for step-by-step metric calculations; off unless DEBUG_STOCKS=1 is set
+DEBUG_STOCKS = os.getenv('DEBUG_STOCKS', '').strip().lower() in ('1', 'true', 'yes')
+
+# Upper bound (seconds) for the backoff between individual downloads
+MAX_DOWNLOAD_BACKOFF = 4
+
+# Simple debug printer - pass a callable to defer building expensive messages
+def _dbg(msg):
+    if not DEBUG_STOCKS:
+        return
     try:
-        if DEBUG_STOCKS:
-            print(msg)
+        print(msg() if callable(msg) else msg)
     except Exception:
         pass
 
+@dataclass(frozen=True, slots=True)
+class StockRecord(Mapping):
+    """Processed per-ticker metrics; read-only Mapping view kept for dict-style callers
+
+    Equality and hashing cover the scalar metrics only: a DataFrame has no truth value
+    and is unhashable, so 'historical' is left out of both.
+    """
+    ticker: str
+    name: str
+    current_price: float
+    previous_close: float
+    change_percent: float
+    volume: int
+    market_cap: float
+    pe_ratio: float
+    dividend_yield: float
+    beta: float
+    volatility: float
+    high_52w: float
+    low_52w: float
+    returns_1m: float
+    returns_3m: float
+    returns_6m: float
+    returns_1y: float
+    historical: pd.DataFrame = field(compare=False, hash=False)
+    sector: str
+    industry: str
+    last_updated: datetime
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in _STOCK_RECORD_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(_STOCK_RECORD_FIELDS)
+
+    def __len__(self) -> int:
+        return len(_STOCK_RECORD_FIELDS)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Shallow dict copy (the historical DataFrame is not copied)"""
+        return {key: getattr(self, key) for key in _STOCK_RECORD_FIELDS}
+
+_STOCK_RECORD_FIELDS = tuple(f.name for f in fields(StockRecord))
+
 # Helpers
-def _first_existing_column(df: pd.DataFrame, candidates: List[str]) -> Optional[str]:
-    for name in candidates:
-        if name in df.columns:
-            return name
-    return None
+def _first_existing_column(columns: set, candidates: List[str]) -> Optional[str]:
+    return next((name for name in candidates if name in columns), None)
+
+def _lowercase_columns(columns: pd.Index) -> pd.Index:
+    """Lowercase column labels in one vectorized pass (tuples are stringified)"""
+    if isinstance(columns, pd.MultiIndex):
+        columns = columns.to_flat_index()
+    return columns.astype(str).str.lower()
 
 # Create cache directory for storing data
 if not os.path.exists('.yfinance_cache'):
     os.makedirs('.yfinance_cache')
 
-def _load_stock_from_csv(ticker: str) -> Optional[pd.DataFrame]:
-    """Load stock data from CSV file (disabled for deployment)"""
-    # CSV loading disabled for Streamlit Cloud deployment
-    # to avoid inotify watch limit issues
-    return None
-
 def _download_top_stocks_data():
     """Download 5+ years of historical data for top stocks using bulk download, store in variables, then combine."""
-    tickers = constants.HK_STOCKS
+    tickers = _HK_STOCKS
     stocks_data = {}
     
     print(f"Downloading data for {len(tickers)} stocks using bulk download...")
@@ -61,12 +121,12 @@ def _download_top_stocks_data():
         )
         
         # Debug: Print data structure
-        _dbg(f"Bulk download completed. Data type: {type(data)}")
-        _dbg(f"Data shape: {data.shape if hasattr(data, 'shape') else 'No shape'}")
-        _dbg(f"Data columns: {list(data.columns) if hasattr(data, 'columns') else 'No columns'}")
+        _dbg(lambda: f"Bulk download completed. Data type: {type(data)}")
+        _dbg(lambda: f"Data shape: {data.shape if hasattr(data, 'shape') else 'No shape'}")
+        _dbg(lambda: f"Data columns: {list(data.columns) if hasattr(data, 'columns') else 'No columns'}")
         if hasattr(data, 'columns') and len(data.columns) > 0:
-            _dbg(f"First few rows:\n{data.head()}")
-        _dbg(f"Available tickers in data: {[t for t in tickers if t in data.columns.get_level_values(0)] if hasattr(data, 'columns') else 'No multiindex'}")
+            _dbg(lambda: f"First few rows:\n{data.head()}")
+        _dbg(lambda: f"Available tickers in data: {[t for t in tickers if t in data.columns.get_level_values(0)] if hasattr(data, 'columns') else 'No multiindex'}")
         
         # Check if we got any data
         if data is None or data.empty or len(data) == 0:
@@ -85,46 +145,47 @@ def _download_top_stocks_data():
 
     # Process each stock like the CSV flow, but keep in variables
     for ticker in tickers:
+        stock_name = _STOCK_NAME_TABLE.get(ticker, ticker)
         try:
             # Guard: make sure ticker data exists in the multiindex
             if hasattr(data, 'columns') and ticker in getattr(data.columns, 'levels', [data.columns])[0]:
                 df = data[ticker].reset_index()
-                _dbg(f"[{ticker}] Extracted from multiindex, shape: {df.shape}")
+                _dbg(lambda: f"[{ticker}] Extracted from multiindex, shape: {df.shape}")
             else:
                 # Fallback for some yfinance versions
                 try:
                     df = data[ticker].reset_index()
-                    _dbg(f"[{ticker}] Extracted from fallback, shape: {df.shape}")
+                    _dbg(lambda: f"[{ticker}] Extracted from fallback, shape: {df.shape}")
                 except Exception as e:
                     _dbg(f"[{ticker}] Failed to extract: {str(e)}")
                     print(f"  No data for {ticker}")
                     continue
                 
             if df.empty:
-                _dbg(f"[{ticker}] DataFrame is empty")
+                _dbg(lambda: f"[{ticker}] DataFrame is empty")
                 print(f"  No data for {ticker}")
                 continue
 
             # Debug: Print raw data before processing
-            _dbg(f"[{ticker}] Raw data columns: {list(df.columns)}")
-            _dbg(f"[{ticker}] Raw data head:\n{df.head()}")
-            _dbg(f"[{ticker}] Raw data dtypes:\n{df.dtypes}")
+            _dbg(lambda: f"[{ticker}] Raw data columns: {list(df.columns)}")
+            _dbg(lambda: f"[{ticker}] Raw data head:\n{df.head()}")
+            _dbg(lambda: f"[{ticker}] Raw data dtypes:\n{df.dtypes}")
 
             # Normalize columns and index
-            df.columns = [col.lower() if isinstance(col, str) else str(col).lower() for col in df.columns]
+            df.columns = _lowercase_columns(df.columns)
             if 'date' in df.columns:
                 df['date'] = pd.to_datetime(df['date'])
                 df = df.set_index('date')
             
-            _dbg(f"[{ticker}] After processing - columns: {list(df.columns)}")
-            _dbg(f"[{ticker}] After processing - shape: {df.shape}")
-            _dbg(f"[{ticker}] After processing - head:\n{df.head()}")
+            _dbg(lambda: f"[{ticker}] After processing - columns: {list(df.columns)}")
+            _dbg(lambda: f"[{ticker}] After processing - shape: {df.shape}")
+            _dbg(lambda: f"[{ticker}] After processing - head:\n{df.head()}")
 
             stock_dfs[ticker] = df
             available.append(ticker)
 
             # Transform into site-friendly metrics
-            stock_data = _process_stock_data(ticker, df)
+            stock_data = _process_stock_data(ticker, df, stock_name)
             if stock_data:
                 stocks_data[ticker] = stock_data
                 print(f"  Loaded {ticker}: {len(df)} rows")
@@ -155,19 +216,26 @@ def _download_top_stocks_data():
     print(f"\nSuccessfully processed {len(stocks_data)} stocks")
     return stocks_data
 
+def _next_backoff(current: float) -> float:
+    """Bounded exponential backoff: 1s, 2s, 4s, capped at MAX_DOWNLOAD_BACKOFF"""
+    return min(current * 2 if current else 1, MAX_DOWNLOAD_BACKOFF)
+
 def _download_individual_stocks(tickers: List[str]) -> Dict:
     """Fallback method: Download stocks individually with delays"""
     stocks_data = {}
     
     print(f"Downloading {len(tickers)} stocks individually...")
     
+    # Seconds to wait before each download. We only get here after the bulk download
+    # failed (usually rate limiting), so start at the first backoff step, double it
+    # after every failure, and return to that floor after a success
+    backoff = _next_backoff(0)
+    
     for i, ticker in enumerate(tickers):
         try:
             print(f"Downloading {ticker} ({i+1}/{len(tickers)})...")
             
-            # Add delay to avoid rate limiting
-            if i > 0:
-                time.sleep(1)  # 1 second delay between downloads
+            time.sleep(backoff)
             
             data = yf.download(
                 ticker,
@@ -180,11 +248,13 @@ def _download_individual_stocks(tickers: List[str]) -> Dict:
             
             if data.empty:
                 print(f"  No data for {ticker}")
+                backoff = _next_backoff(backoff)
                 continue
+            backoff = _next_backoff(0)
             
             # Process the data
             df = data.reset_index()
-            df.columns = [col.lower() if isinstance(col, str) else str(col).lower() for col in df.columns]
+            df.columns = _lowercase_columns(df.columns)
             
             if 'date' in df.columns:
                 df['date'] = pd.to_datetime(df['date'])
@@ -197,6 +267,7 @@ def _download_individual_stocks(tickers: List[str]) -> Dict:
         
         except Exception as e:
             print(f"  ✗ Failed to download {ticker}: {str(e)}")
+            backoff = _next_backoff(backoff)
             continue
     
     print(f"Successfully processed {len(stocks_data)} stocks individually")
@@ -224,85 +295,7 @@ def _initialize_stock_data():
         st.session_state.top_stocks_data = _download_top_stocks_data()
         st.session_state.last_refresh_time = datetime.now()
 
-def _fetch_single_stock_yfinance(ticker: str) -> Optional[Dict]:
-    """Fetch data for a single stock using yfinance"""
-    try:
-        # Use individual ticker download for stocks not in top 20
-        data = yf.download(
-            ticker,
-            start="2018-01-01",
-            end=None,
-            interval='1d',
-            progress=False,
-            threads=True
-        )
-        
-        if data.empty:
-            return None
-            
-        df = data.copy()
-        
-        # Rename columns to lowercase
-        df.columns = [col.lower() if isinstance(col, str) else str(col).lower() for col in df.columns]
-        
-        # Get stock name
-        stock_name = constants.STOCK_NAMES.get(ticker, ticker)
-        
-        # Calculate metrics
-        current_price = df['close'].iloc[-1] if 'close' in df.columns else df.iloc[:, 0].iloc[-1]
-        prev_close = df['close'].iloc[-2] if len(df) > 1 and 'close' in df.columns else current_price
-        change_pct = ((current_price - prev_close) / prev_close * 100) if prev_close > 0 else 0
-        
-        # Calculate historical returns
-        returns_1m = df['close'].pct_change(20).iloc[-1] * 100 if len(df) > 20 and 'close' in df.columns else 0
-        returns_3m = df['close'].pct_change(60).iloc[-1] * 100 if len(df) > 60 and 'close' in df.columns else 0
-        returns_6m = df['close'].pct_change(120).iloc[-1] * 100 if len(df) > 120 and 'close' in df.columns else 0
-        returns_1y = df['close'].pct_change(252).iloc[-1] * 100 if len(df) > 252 and 'close' in df.columns else 0
-        
-        # Volatility (annualized)
-        volatility = df['close'].pct_change().std() * (252 ** 0.5) * 100 if 'close' in df.columns else 0
-        
-        # 52-week high/low (compute df_len locally for this function)
-        df_len_local = len(df)
-        high_52w = df['high'].tail(252).max() if df_len_local >= 252 and 'high' in df.columns else df['high'].max() if 'high' in df.columns else current_price
-        low_52w = df['low'].tail(252).min() if df_len_local >= 252 and 'low' in df.columns else df['low'].min() if 'low' in df.columns else current_price
-        
-        # Handle NaN values safely
-        volume_value = df['volume'].iloc[-1] if 'volume' in df.columns else 0
-        volume_int = int(volume_value) if pd.notna(volume_value) else 0
-        
-        hist_data = df[['open', 'high', 'low', 'close', 'volume']].tail(252) if all(col in df.columns for col in ['open', 'high', 'low', 'close', 'volume']) else df.iloc[:, :5].tail(252)
-        
-        result = {
-            'ticker': ticker,
-            'name': stock_name,
-            'current_price': current_price,
-            'previous_close': prev_close,
-            'change_percent': round(change_pct, 2) if pd.notna(change_pct) else 0,
-            'volume': volume_int,
-            'market_cap': 0,
-            'pe_ratio': 0,
-            'dividend_yield': 0,
-            'beta': 1.0,
-            'volatility': round(volatility, 2) if pd.notna(volatility) else 0,
-            'high_52w': high_52w,
-            'low_52w': low_52w,
-            'returns_1m': round(returns_1m, 2) if pd.notna(returns_1m) else 0,
-            'returns_3m': round(returns_3m, 2) if pd.notna(returns_3m) else 0,
-            'returns_6m': round(returns_6m, 2) if pd.notna(returns_6m) else 0,
-            'returns_1y': round(returns_1y, 2) if pd.notna(returns_1y) else 0,
-            'historical': hist_data,
-            'sector': 'Unknown',
-            'industry': 'Unknown',
-            'last_updated': datetime.now()
-        }
-        _dbg(f"[{ticker}] result summary: price={result['current_price']}, change%={result['change_percent']}, vol={result['volume']}")
-        return result
-    except Exception as e:
-        print(f"Error fetching {ticker}: {str(e)}")
-        return None
-
-def get_stock_data(ticker: str, use_cache: bool = True) -> Optional[Dict]:
+def get_stock_data(ticker: str, use_cache: bool = True) -> Optional[StockRecord]:
     """Get stock data for a specific ticker"""
     _initialize_stock_data()
     
@@ -310,6 +303,12 @@ def get_stock_data(ticker: str, use_cache: bool = True) -> Optional[Dict]:
     if 'top_stocks_data' in st.session_state and ticker in st.session_state.top_stocks_data:
         return st.session_state.top_stocks_data[ticker]
     
+    # Then check the MongoDB cache (same-day entries only)
+    if use_cache:
+        cached = _get_cached_stock(ticker)
+        if cached:
+            return cached
+    
     # Otherwise fetch it individually using bulk download for efficiency
     try:
         print(f"Fetching individual stock data for {ticker}...")
@@ -328,22 +327,62 @@ def get_stock_data(ticker: str, use_cache: bool = True) -> Optional[Dict]:
         
         # Process the data
         df = data.reset_index()
-        df.columns = [col.lower() if isinstance(col, str) else str(col).lower() for col in df.columns]
+        df.columns = _lowercase_columns(df.columns)
         
         if 'date' in df.columns:
             df['date'] = pd.to_datetime(df['date'])
             df = df.set_index('date')
         
-        return _process_stock_data(ticker, df)
+        result = _process_stock_data(ticker, df)
+        if result:
+            _cache_stock(ticker, result)
+        return result
         
     except Exception as e:
         print(f"Error fetching {ticker}: {str(e)}")
         return None
 
-def _process_stock_data(ticker: str, df: pd.DataFrame) -> Optional[Dict]:
-    """Process stock data DataFrame into standardized format"""
+def _serialize_historical(hist: pd.DataFrame) -> bytes:
+    """Serialize a historical DataFrame to an Arrow IPC stream"""
+    table = pa.Table.from_pandas(hist)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+def _deserialize_historical(blob: bytes) -> pd.DataFrame:
+    """Read a historical DataFrame back from an Arrow IPC stream"""
+    return pa.ipc.open_stream(blob).read_pandas()
+
+def _cache_stock(ticker: str, data: StockRecord):
+    """Store processed stock data in MongoDB, keeping 'historical' as Arrow IPC bytes"""
+    if not PYARROW_AVAILABLE:
+        return
     try:
-        _dbg(f"[{ticker}] start processing")
+        doc = data.as_dict()
+        doc['historical'] = _serialize_historical(data.historical)
+        db.cache_stock_data(ticker, doc)
+    except Exception as e:
+        print(f"Failed to cache {ticker}: {str(e)}")
+
+def _get_cached_stock(ticker: str) -> Optional[StockRecord]:
+    """Load processed stock data from MongoDB, restoring the 'historical' frame"""
+    if not PYARROW_AVAILABLE:
+        return None
+    try:
+        cached = db.get_cached_stock_data(ticker)
+        if not cached or not cached.get('historical'):
+            return None
+        cached['historical'] = _deserialize_historical(cached['historical'])
+        return StockRecord(**{key: cached[key] for key in _STOCK_RECORD_FIELDS})
+    except Exception as e:
+        print(f"Failed to read cached {ticker}: {str(e)}")
+        return None
+
+def _process_stock_data(ticker: str, df: pd.DataFrame, stock_name: Optional[str] = None) -> Optional[StockRecord]:
+    """Process stock data DataFrame into standardized format (stock_name may be pre-resolved by the caller)"""
+    try:
+        _dbg(lambda: f"[{ticker}] start processing")
 
         # Normalize canonical column names if needed
         # Sometimes yfinance returns 'Adj Close' or lowercase already
@@ -351,114 +390,111 @@ def _process_stock_data(ticker: str, df: pd.DataFrame) -> Optional[Dict]:
         if 'Adj Close'.lower() in df.columns:
             pass
         # ensure lowercase names for safety
-        df.columns = [c.lower() if isinstance(c, str) else c for c in df.columns]
+        df.columns = _lowercase_columns(df.columns)
 
-        # Choose columns
-        close_col = _first_existing_column(df, ['close', 'adj close', 'adj_close'])
-        open_col = _first_existing_column(df, ['open'])
-        high_col = _first_existing_column(df, ['high'])
-        low_col = _first_existing_column(df, ['low'])
-        volume_col = _first_existing_column(df, ['volume'])
+        # Choose columns (one set build, O(1) membership per candidate)
+        columns = set(df.columns)
+        close_col = _first_existing_column(columns, ['close', 'adj close', 'adj_close'])
+        open_col = 'open' if 'open' in columns else None
+        high_col = 'high' if 'high' in columns else None
+        low_col = 'low' if 'low' in columns else None
+        volume_col = 'volume' if 'volume' in columns else None
 
         if close_col is None:
-            _dbg(f"[{ticker}] missing close column; columns={list(df.columns)}")
+            _dbg(lambda: f"[{ticker}] missing close column; columns={list(df.columns)}")
             return None
 
         # Get stock name
-        stock_name = constants.STOCK_NAMES.get(ticker, ticker)
+        if stock_name is None:
+            stock_name = _STOCK_NAME_TABLE.get(ticker, ticker)
 
         # Current and previous close - get last valid values
         close_series = df[close_col].dropna()
         if close_series.empty:
-            _dbg(f"[{ticker}] No valid close prices found")
+            _dbg(lambda: f"[{ticker}] No valid close prices found")
             return None
             
-        current_price = float(close_series.iloc[-1])
-        prev_close = float(close_series.iloc[-2]) if len(close_series) > 1 else current_price
+        close_values = close_series.to_numpy()
+        current_price = float(close_values[-1])
+        prev_close = float(close_values[-2]) if close_values.size > 1 else current_price
         change_pct = float(((current_price - prev_close) / prev_close * 100)) if prev_close not in (0, 0.0) else 0.0
-        _dbg(f"[{ticker}] prices: current={current_price}, prev={prev_close}, change%={change_pct}")
+        _dbg(lambda: f"[{ticker}] prices: current={current_price}, prev={prev_close}, change%={change_pct}")
 
         # Historical returns
         df_len = len(df)
         def pct_return(days: int) -> float:
-            if df_len > days and close_col in df.columns:
-                val = df[close_col].pct_change(days).iloc[-1]
+            if df_len > days:
+                val = df[close_col].pct_change(days).iat[-1]
                 return float(val * 100) if pd.notna(val) else 0.0
             return 0.0
         returns_1m = pct_return(20)
         returns_3m = pct_return(60)
         returns_6m = pct_return(120)
         returns_1y = pct_return(252)
-        _dbg(f"[{ticker}] returns: 1m={returns_1m}, 3m={returns_3m}, 6m={returns_6m}, 1y={returns_1y}")
+        _dbg(lambda: f"[{ticker}] returns: 1m={returns_1m}, 3m={returns_3m}, 6m={returns_6m}, 1y={returns_1y}")
 
         # Volatility (annualized)
-        if close_col in df.columns:
-            vol_series = df[close_col].pct_change()
-            volatility = float(vol_series.std() * (252 ** 0.5) * 100) if vol_series.notna().sum() > 1 else 0.0
-        else:
-            volatility = 0.0
-        _dbg(f"[{ticker}] volatility={volatility}")
+        vol_series = df[close_col].pct_change()
+        volatility = float(vol_series.std() * (252 ** 0.5) * 100) if vol_series.notna().sum() > 1 else 0.0
+        _dbg(lambda: f"[{ticker}] volatility={volatility}")
+
+        # Trailing 52-week window, sliced once and shared by high/low and the chart history
+        tail = df.iloc[-252:]
 
         # 52-week high/low
-        if high_col and high_col in df.columns:
-            high_52w = float(df[high_col].tail(252).max()) if df_len >= 2 else float(df[high_col].max())
-        else:
-            high_52w = current_price
-        if low_col and low_col in df.columns:
-            low_52w = float(df[low_col].tail(252).min()) if df_len >= 2 else float(df[low_col].min())
-        else:
-            low_52w = current_price
-        _dbg(f"[{ticker}] 52w: high={high_52w}, low={low_52w}")
+        high_52w = float(tail[high_col].max()) if high_col else current_price
+        low_52w = float(tail[low_col].min()) if low_col else current_price
+        _dbg(lambda: f"[{ticker}] 52w: high={high_52w}, low={low_52w}")
 
         # Volume - get last valid volume
-        if volume_col and volume_col in df.columns:
+        if volume_col:
             volume_series = df[volume_col].dropna()
             if not volume_series.empty:
-                volume_value = volume_series.iloc[-1]
+                volume_value = volume_series.iat[-1]
                 volume_int = int(volume_value) if pd.notna(volume_value) else 0
             else:
                 volume_int = 0
         else:
             volume_int = 0
-        _dbg(f"[{ticker}] volume={volume_int}")
+        _dbg(lambda: f"[{ticker}] volume={volume_int}")
 
         # Historical slice for charts
-        if all(col in df.columns for col in [open_col or 'open', high_col or 'high', low_col or 'low', close_col or 'close', volume_col or 'volume']):
-            cols = [open_col or 'open', high_col or 'high', low_col or 'low', close_col or 'close', volume_col or 'volume']
-            hist_data = df[cols].tail(252)
+        if open_col and high_col and low_col and volume_col:
+            cols = [open_col, high_col, low_col, close_col, volume_col]
+            hist_data = tail[cols]
         else:
             # fallback: take first up to 5 cols
-            hist_data = df.iloc[:, :5].tail(252)
-        _dbg(f"[{ticker}] hist rows={len(hist_data)}")
+            hist_data = tail.iloc[:, :5]
+        _dbg(lambda: f"[{ticker}] hist rows={len(hist_data)}")
         
-        return {
-            'ticker': ticker,
-            'name': stock_name,
-            'current_price': current_price,
-            'previous_close': prev_close,
-            'change_percent': round(change_pct, 2) if pd.notna(change_pct) else 0,
-            'volume': volume_int,
-            'market_cap': 0,
-            'pe_ratio': 0,
-            'dividend_yield': 0,
-            'beta': 1.0,
-            'volatility': round(volatility, 2) if pd.notna(volatility) else 0,
-            'high_52w': high_52w,
-            'low_52w': low_52w,
-            'returns_1m': round(returns_1m, 2) if pd.notna(returns_1m) else 0,
-            'returns_3m': round(returns_3m, 2) if pd.notna(returns_3m) else 0,
-            'returns_6m': round(returns_6m, 2) if pd.notna(returns_6m) else 0,
-            'returns_1y': round(returns_1y, 2) if pd.notna(returns_1y) else 0,
-            'historical': hist_data,
-            'sector': 'Unknown',
-            'industry': 'Unknown',
-            'last_updated': datetime.now()
-        }
+        return StockRecord(
+            ticker=ticker,
+            name=stock_name,
+            current_price=current_price,
+            previous_close=prev_close,
+            change_percent=round(change_pct, 2) if pd.notna(change_pct) else 0,
+            volume=volume_int,
+            market_cap=0,
+            pe_ratio=0,
+            dividend_yield=0,
+            beta=1.0,
+            volatility=round(volatility, 2) if pd.notna(volatility) else 0,
+            high_52w=high_52w,
+            low_52w=low_52w,
+            returns_1m=round(returns_1m, 2) if pd.notna(returns_1m) else 0,
+            returns_3m=round(returns_3m, 2) if pd.notna(returns_3m) else 0,
+            returns_6m=round(returns_6m, 2) if pd.notna(returns_6m) else 0,
+            returns_1y=round(returns_1y, 2) if pd.notna(returns_1y) else 0,
+            historical=hist_data,
+            sector='Unknown',
+            industry='Unknown',
+            last_updated=datetime.now()
+        )
     except Exception as e:
         print(f"Error processing {ticker}: {str(e)}")
         return None
 
-def get_multiple_stocks(tickers: List[str], use_cache: bool = True) -> Dict[str, Optional[Dict]]:
+def get_multiple_stocks(tickers: List[str], use_cache: bool = True) -> Dict[str, Optional[StockRecord]]:
     """Get multiple stocks"""
     _initialize_stock_data()
     
@@ -470,7 +506,7 @@ def get_multiple_stocks(tickers: List[str], use_cache: bool = True) -> Dict[str,
     
     return results
 
-def get_all_stocks() -> Dict[str, Optional[Dict]]:
+def get_all_stocks() -> Dict[str, Optional[StockRecord]]:
     """Get all top 20 stocks with their data"""
     _initialize_stock_data()
     
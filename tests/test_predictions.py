@@ -0,0 +1,45 @@
+"""Tests for utils.predictions"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.predictions import _rolling_mean_std
+
+
+def _flat_windows(values: np.ndarray, period: int) -> np.ndarray:
+    """Mask of trailing windows whose values are all equal"""
+    return pd.Series(values).rolling(period).apply(lambda w: (w == w[0]).all(), raw=True).to_numpy() == 1
+
+
+@pytest.mark.parametrize('period', [2, 5, 20])
+def test_rolling_mean_std_matches_pandas(period):
+    rng = np.random.default_rng(period)
+    for case in range(100):
+        values = rng.normal(0, 1, int(rng.integers(30, 300))).round(1)
+        if case % 3 == 0:
+            values[10:40] = values[10]  # flat stretch
+        if case % 4 == 0:
+            values[rng.integers(0, len(values), 3)] = np.nan  # gaps
+
+        mean, std = _rolling_mean_std(values, period)
+        rolling = pd.Series(values).rolling(period)
+
+        np.testing.assert_allclose(mean, rolling.mean().to_numpy(), rtol=1e-12, atol=1e-12)
+        # pandas itself leaves ~1e-8 of cancellation noise on flat windows
+        np.testing.assert_allclose(std, rolling.std().to_numpy(), rtol=1e-9, atol=1e-7)
+        assert np.all(std[_flat_windows(values, period)] == 0.0)
+
+
+def test_rolling_std_is_exactly_zero_for_equal_neighbours():
+    _, std = _rolling_mean_std(np.array([-0.4, -0.4]), 2)
+    assert std[1] == 0.0
+
+
+def test_rolling_std_does_not_drift_on_long_series():
+    rng = np.random.default_rng(0)
+    prices = 100 * np.cumprod(1 + rng.normal(0, 0.01, 5000))
+
+    _, std = _rolling_mean_std(prices, 20)
+    exact = np.array([np.std(prices[i - 19:i + 1], ddof=1) for i in range(19, len(prices))])
+
+    np.testing.assert_allclose(std[19:], exact, rtol=1e-10)
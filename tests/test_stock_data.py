@@ -0,0 +1,66 @@
+"""Tests for services.stock_data"""
+import pickle
+
+import numpy as np
+import pandas as pd
+
+import services.stock_data as stock_data
+
+
+def _price_frame(rows: int = 300, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.01, rows))
+    return pd.DataFrame(
+        {
+            'open': close,
+            'high': close * 1.01,
+            'low': close * 0.99,
+            'close': close,
+            'volume': rng.integers(1_000, 10_000, rows),
+        },
+        index=pd.date_range('2023-01-02', periods=rows, freq='B', name='date'),
+    )
+
+
+def _record(**overrides) -> stock_data.StockRecord:
+    record = stock_data._process_stock_data('0700.HK', _price_frame(), 'Tencent')
+    return stock_data.StockRecord(**{**record.as_dict(), **overrides})
+
+
+def test_records_compare_by_metrics():
+    record = _record()
+    same = _record(historical=record.historical.copy(), last_updated=record.last_updated)
+
+    assert record == same
+    assert hash(record) == hash(same)
+    assert record in [same]
+    assert len({record, same}) == 1
+    assert record != _record(current_price=record.current_price + 1, last_updated=record.last_updated)
+
+
+def test_record_survives_pickle_round_trip():
+    record = _record()
+    restored = pickle.loads(pickle.dumps(record))
+
+    assert restored == record
+    assert hash(restored) == hash(record)
+    pd.testing.assert_frame_equal(restored.historical, record.historical)
+
+
+def test_debug_messages_are_not_built_when_disabled(monkeypatch, capsys):
+    monkeypatch.setattr(stock_data, 'DEBUG_STOCKS', False)
+    calls = []
+
+    stock_data._dbg(lambda: calls.append('built') or 'message')
+    stock_data._process_stock_data('0700.HK', _price_frame(), 'Tencent')
+
+    assert calls == []
+    assert '[0700.HK]' not in capsys.readouterr().out
+
+
+def test_debug_messages_are_printed_when_enabled(monkeypatch, capsys):
+    monkeypatch.setattr(stock_data, 'DEBUG_STOCKS', True)
+
+    stock_data._dbg(lambda: 'deferred message')
+
+    assert capsys.readouterr().out == 'deferred message\n'
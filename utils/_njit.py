@@ -0,0 +1,14 @@
+"""Optional numba JIT for the numeric hot loops in the prediction utilities"""
+
+# numba compiles the indicator/simulation kernels to machine code; without it they run as plain Python
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit (supports both @njit and @njit(...))"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
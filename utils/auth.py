@@ -1,18 +1,65 @@
 """Authentication Helper Functions - SECURE VERSION with session-only tokens and device binding"""
 import streamlit as st
-import jwt
-from datetime import datetime, timedelta
+from datetime import timedelta
 import os
-import hashlib
+import time
+import base64
+import binascii
+import functools
+import hmac
+import json
 import secrets
 import socket
 
+# orjson serializes the small token payloads much faster; stdlib json is the fallback
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+    ORJSON_AVAILABLE = True
+except ImportError:
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(',', ':')).encode()
+    _json_loads = json.loads
+    ORJSON_AVAILABLE = False
+
 # Secret key for JWT signing
 SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'default_secret_key_change_in_production')
 
+# HS256 signing material, prepared once: the header never changes
+_KEY = SECRET_KEY.encode()
+_HEADER_B64 = base64.urlsafe_b64encode(b'{"alg":"HS256","typ":"JWT"}').rstrip(b'=')
+
 # Token expiration times
 ACCESS_TOKEN_EXPIRY = timedelta(hours=1)  # Short-lived access token
 REFRESH_TOKEN_EXPIRY = timedelta(hours=1)  # Same as access token - enforce 1 hour logout
+_ACCESS_EXPIRY_S = int(ACCESS_TOKEN_EXPIRY.total_seconds())
+_REFRESH_EXPIRY_S = int(REFRESH_TOKEN_EXPIRY.total_seconds())
+
+# Internal Streamlit state that logout_user must not clear
+_LOGOUT_KEEP_KEYS = frozenset(('_state', '_session_state'))
+
+# Client IP headers, in order of preference
+_IP_HEADERS = (
+    'X-Forwarded-For',      # Most common for reverse proxies
+    'X-Real-Ip',            # Alternative header
+    'CF-Connecting-Ip',     # Cloudflare
+    'True-Client-Ip',       # Some CDNs
+    'X-Client-Ip',          # Alternative
+)
+
+# Server's own address, resolved on first use (the DNS lookup can block)
+_LOCAL_IP = None
+
+def _get_local_ip():
+    """Resolve this host's IP once per process"""
+    global _LOCAL_IP
+    if _LOCAL_IP is None:
+        try:
+            _LOCAL_IP = socket.gethostbyname(socket.gethostname())
+        except Exception:
+            _LOCAL_IP = "127.0.0.1"  # Localhost fallback
+    return _LOCAL_IP
 
 def _get_client_ip():
     """Extract client IP address from request headers
@@ -25,30 +72,17 @@ def _get_client_ip():
         headers = st.runtime.scriptrunner.get_script_run_ctx().request_info.headers if hasattr(st.runtime, 'scriptrunner') else {}
         
         # Check various IP headers (in order of preference)
-        ip_headers = [
-            'X-Forwarded-For',      # Most common for reverse proxies
-            'X-Real-Ip',            # Alternative header
-            'CF-Connecting-Ip',     # Cloudflare
-            'True-Client-Ip',       # Some CDNs
-            'X-Client-Ip',          # Alternative
-        ]
-        
-        for header in ip_headers:
-            if header in headers:
+        for header in _IP_HEADERS:
+            value = headers.get(header)
+            if value:
                 # X-Forwarded-For can have multiple IPs (client, proxy1, proxy2...)
                 # Get the first one (original client)
-                ip_list = headers[header].split(',')
-                ip = ip_list[0].strip()
+                ip = value.split(',', 1)[0].strip() if ',' in value else value.strip()
                 if ip:
                     return ip
         
-        # Fallback: try to get from server context
-        try:
-            # For localhost/development, use a default identifier
-            hostname = socket.gethostname()
-            return socket.gethostbyname(hostname)
-        except:
-            return "127.0.0.1"  # Localhost fallback
+        # Fallback: for localhost/development, use the server's own address
+        return _get_local_ip()
         
     except Exception as e:
         # If all else fails, return a default that will still enforce consistency
@@ -57,51 +91,97 @@ def _get_client_ip():
 def _get_or_generate_device_id():
     """Generate a unique device ID for this browser session
     
-    SECURITY: This creates a device fingerprint based on browser session.
+    SECURITY: This creates a random device identifier for the browser session.
     Each browser tab/window gets a unique device_id that persists in session_state.
     """
     # Check if device_id already exists in session
     if 'device_id' not in st.session_state or not st.session_state.device_id:
-        # Generate a unique device ID based on session and some randomness
-        # Combine session ID with random token for uniqueness
-        session_id = st.session_state.get('session_id', secrets.token_hex(16))
-        random_token = secrets.token_hex(16)
-        
-        # Create a hash-based device identifier
-        device_fingerprint = f"{session_id}:{random_token}"
-        device_id = hashlib.sha256(device_fingerprint.encode()).hexdigest()
-        
-        st.session_state.device_id = device_id
+        # 256 random bits from the OS CSPRNG (same width as the old SHA-256 hex id)
+        st.session_state.device_id = secrets.token_hex(32)
     
     return st.session_state.device_id
 
-def _generate_token(user_id: str, username: str, email: str, device_id: str, client_ip: str, expiry: timedelta) -> str:
+def _b64url_encode(data: bytes) -> bytes:
+    """Base64url without padding (RFC 7515)"""
+    return base64.urlsafe_b64encode(data).rstrip(b'=')
+
+def _b64url_decode(data: bytes) -> bytes:
+    """Inverse of _b64url_encode"""
+    return base64.urlsafe_b64decode(data + b'=' * (-len(data) % 4))
+
+def _sign(signing_input: bytes) -> bytes:
+    """HS256 signature over header.payload"""
+    return hmac.digest(_KEY, signing_input, 'sha256')
+
+def _generate_token(user_id: str, username: str, email: str, device_id: str, client_ip: str, expiry_s: int, now: int = None, /) -> str:
     """Generate a JWT token with device and IP binding
     
     SECURITY: Each JWT is bound to a specific device_id AND client IP address.
     Tokens from one device/IP cannot be used on another device/IP, even if someone intercepts the token.
     """
-    now = datetime.now(datetime.UTC) if hasattr(datetime, 'UTC') else datetime.utcnow()
-    payload = {
+    if now is None:
+        now = int(time.time())
+    signing_input = _HEADER_B64 + b'.' + _b64url_encode(_json_dumps({
         'user_id': user_id,
         'username': username,
         'email': email,
         'device_id': device_id,  # Device binding for security
         'client_ip': client_ip,  # IP address binding for additional security
-        'exp': now + expiry,
+        'exp': now + expiry_s,
         'iat': now
-    }
-    return jwt.encode(payload, SECRET_KEY, algorithm='HS256')
+    }))
+    return (signing_input + b'.' + _b64url_encode(_sign(signing_input))).decode('ascii')
 
-def _decode_token(token: str) -> dict:
-    """Decode and validate a JWT token"""
+@functools.lru_cache(maxsize=512)
+def _decode_raw(token: str) -> dict:
+    """Verify a JWT signature and return its payload, ignoring expiry
+    
+    Cached per token string: tokens are immutable, so the HMAC check only
+    needs to run once. Expiry is checked by the caller on every use.
+    """
+    try:
+        header_b64, payload_b64, signature_b64 = token.encode('ascii').split(b'.')
+        signature = _b64url_decode(signature_b64)
+    except (AttributeError, UnicodeError, ValueError, binascii.Error):
+        return None
+    
+    # Only accept the exact HS256 header we issue (no algorithm negotiation)
+    if header_b64 != _HEADER_B64:
+        return None
+    if not hmac.compare_digest(signature, _sign(header_b64 + b'.' + payload_b64)):
+        return None
+    
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=['HS256'])
-        return payload
-    except jwt.ExpiredSignatureError:
+        payload = _json_loads(_b64url_decode(payload_b64))
+    except (ValueError, binascii.Error):
+        return None
+    return payload if isinstance(payload, dict) else None
+
+def _decode_token(token: str, now: float = None) -> dict:
+    """Decode and validate a JWT token (expiry checked against now, default current time)"""
+    payload = _decode_raw(token)
+    if payload is None:
         return None
-    except jwt.InvalidTokenError:
+    exp = payload.get('exp')
+    if now is None:
+        now = time.time()
+    if not isinstance(exp, (int, float)) or exp <= now:
         return None
+    return payload
+
+def _binding_matches(payload: dict, device_id: str, client_ip: str) -> bool:
+    """Check that a decoded token is bound to the given device and IP"""
+    return payload.get('device_id') == device_id and payload.get('client_ip') == client_ip
+
+def _restore_session(payload: dict, access_token: str, refresh_token: str):
+    """Write user info and tokens into session_state"""
+    st.session_state.update({
+        'user_id': payload['user_id'],
+        'username': payload['username'],
+        'email': payload['email'],
+        'access_token': access_token,
+        'refresh_token': refresh_token,
+    })
 
 def is_logged_in():
     """Check if user is logged in - session-based authentication with device and IP binding
@@ -111,82 +191,81 @@ def is_logged_in():
     Tokens only exist in session_state during active session.
     Each token is bound to a specific device_id AND client_ip for additional security.
     """
+    ss = st.session_state
+    
     # Initialize session state if not exists
-    if 'auth_initialized' not in st.session_state:
-        st.session_state.auth_initialized = True
-        st.session_state.user_id = None
-        st.session_state.username = None
-        st.session_state.email = None
-        st.session_state.access_token = None
-        st.session_state.refresh_token = None
-        st.session_state.device_id = None
-        st.session_state.client_ip = None
+    if 'auth_initialized' not in ss:
+        ss.auth_initialized = True
+        ss.user_id = None
+        ss.username = None
+        ss.email = None
+        ss.access_token = None
+        ss.refresh_token = None
+        ss.device_id = None
+        ss.client_ip = None
+    
+    access_token = ss.get('access_token')
+    refresh_token = ss.get('refresh_token')
+    
+    # No tokens at all - nothing to bind, skip the device/IP lookup
+    if not access_token and not refresh_token:
+        return False
+    
+    # One clock read shared by the fast path, expiry checks and any token refresh
+    now = time.time()
     
     # Get current IP and device_id
     current_device_id = _get_or_generate_device_id()
     current_ip = _get_client_ip()
     
+    # Fast path: this access token was already verified for this device and IP
+    verified = ss.get('_auth_verified')
+    if verified and verified[:3] == (access_token, current_device_id, current_ip) and verified[3] > now:
+        return True
+    
     # Check if we have valid tokens in session state
-    access_token = st.session_state.get('access_token')
     if access_token:
-        payload = _decode_token(access_token)
+        payload = _decode_token(access_token, now)
         if payload:
-            # Validate device_id matches current device
-            token_device_id = payload.get('device_id')
-            token_client_ip = payload.get('client_ip')
-            
-            if token_device_id != current_device_id:
-                # Device mismatch - invalidate session
-                logout_user()
-                return False
-            
-            if token_client_ip != current_ip:
-                # IP mismatch - invalidate session (user changed network/location)
+            # Device or IP mismatch (user changed device/network) - invalidate session
+            if not _binding_matches(payload, current_device_id, current_ip):
                 logout_user()
                 return False
             
             # Valid access token with matching device and IP - user is logged in
             # Ensure user info is set
-            if 'user_id' not in st.session_state or st.session_state.user_id is None:
-                st.session_state.user_id = payload['user_id']
-                st.session_state.username = payload['username']
-                st.session_state.email = payload['email']
+            if ss.get('user_id') is None:
+                ss.update({
+                    'user_id': payload['user_id'],
+                    'username': payload['username'],
+                    'email': payload['email'],
+                })
+            ss._auth_verified = (access_token, current_device_id, current_ip, payload['exp'])
             return True
     
-    # Check refresh token in session state
-    refresh_token = st.session_state.get('refresh_token')
-    if refresh_token:
-        payload = _decode_token(refresh_token)
+    # Check refresh token in session state (skip if it is the access token that just failed)
+    if refresh_token and refresh_token is not access_token:
+        payload = _decode_token(refresh_token, now)
         if payload:
-            # Validate device_id and IP match current device
-            token_device_id = payload.get('device_id')
-            token_client_ip = payload.get('client_ip')
-            
-            if token_device_id != current_device_id:
-                # Device mismatch - invalidate session
-                logout_user()
-                return False
-            
-            if token_client_ip != current_ip:
-                # IP mismatch - invalidate session
+            # Device or IP mismatch (user changed device/network) - invalidate session
+            if not _binding_matches(payload, current_device_id, current_ip):
                 logout_user()
                 return False
             
             # Valid refresh token with matching device and IP, generate new access token
-            user_id = payload['user_id']
-            username = payload['username']
-            email = payload['email']
-            device_id = payload['device_id']
-            client_ip = payload['client_ip']
-            
-            new_access_token = _generate_token(user_id, username, email, device_id, client_ip, ACCESS_TOKEN_EXPIRY)
+            new_access_token = _generate_token(
+                payload['user_id'],
+                payload['username'],
+                payload['email'],
+                payload['device_id'],
+                payload['client_ip'],
+                _ACCESS_EXPIRY_S,
+                int(now)
+            )
             
             # Update session state
-            st.session_state.user_id = user_id
-            st.session_state.username = username
-            st.session_state.email = email
-            st.session_state.access_token = new_access_token
-            st.session_state.refresh_token = refresh_token
+            _restore_session(payload, new_access_token, refresh_token)
+            ss._auth_verified = (new_access_token, current_device_id, current_ip, payload['exp'])
             
             return True
     
@@ -209,15 +288,23 @@ def login_user(user_id: str, username: str, email: str):
     
     # Generate tokens (both expire after 1 hour - auto logout enforced)
     # Both tokens are bound to this specific device AND IP address
-    access_token = _generate_token(user_id, username, email, device_id, client_ip, ACCESS_TOKEN_EXPIRY)
-    refresh_token = _generate_token(user_id, username, email, device_id, client_ip, REFRESH_TOKEN_EXPIRY)
+    now = int(time.time())
+    access_token = _generate_token(user_id, username, email, device_id, client_ip, _ACCESS_EXPIRY_S, now)
+    if _REFRESH_EXPIRY_S == _ACCESS_EXPIRY_S:
+        # Identical claims - reuse the access token instead of signing it twice
+        refresh_token = access_token
+    else:
+        refresh_token = _generate_token(user_id, username, email, device_id, client_ip, _REFRESH_EXPIRY_S, now)
     
     # Store in session state ONLY
-    st.session_state.user_id = user_id
-    st.session_state.username = username
-    st.session_state.email = email
-    st.session_state.access_token = access_token
-    st.session_state.refresh_token = refresh_token
+    st.session_state.pop('_auth_verified', None)
+    st.session_state.update({
+        'user_id': user_id,
+        'username': username,
+        'email': email,
+        'access_token': access_token,
+        'refresh_token': refresh_token,
+    })
 
 def logout_user():
     """Clear user session and tokens
@@ -225,37 +312,18 @@ def logout_user():
     SECURITY: Completely wipes all session data to prevent data leakage between users.
     This is critical to ensure different users cannot see each other's data.
     """
-    # CRITICAL SECURITY: Clear ALL session state to prevent data leakage
-    # List of all known session state keys that must be cleared
-    keys_to_clear = [
-        # Authentication state
-        'user_id', 'username', 'email', 
-        'access_token', 'refresh_token',
-        'device_id', 'client_ip',
-        'auth_initialized',
-        # App-specific data
-        'stocks_loaded', 'portfolio_refreshed', 'chatbot_open',
-        'chat_history',
-        'stock_dfs', 'combined_df',
-        'top_stocks_data', 'last_refresh_time',
-        'stocks_data', 'session_id',
-    ]
+    # Drop cached token verifications
+    _decode_raw.cache_clear()
     
-    # Clear all specified keys
-    for key in keys_to_clear:
-        if key in st.session_state:
+    # CRITICAL SECURITY: Clear ALL session state to prevent data leakage
+    # This is a nuclear option but necessary for security: a single pass over
+    # every key ensures absolutely no residual data persists between users
+    # (set difference skips internal Streamlit state without a per-key check)
+    for key in set(st.session_state.keys()) - _LOGOUT_KEEP_KEYS:
+        try:
             del st.session_state[key]
-    
-    # CRITICAL: Force Streamlit to completely reset session
-    # This ensures absolutely no residual data persists
-    # Clear any remaining session state we might have missed
-    # This is a nuclear option but necessary for security
-    for key in list(st.session_state.keys()):
-        if key not in ['_state', '_session_state']:  # Don't clear internal Streamlit state
-            try:
-                del st.session_state[key]
-            except:
-                pass
+        except KeyError:
+            pass
 
 def get_user_id():
     """Get current user ID"""
@@ -271,16 +339,14 @@ def get_email():
 
 def refresh_access_token():
     """Manually refresh the access token using the refresh token"""
-    if 'refresh_token' in st.session_state:
-        payload = _decode_token(st.session_state.refresh_token)
+    ss = st.session_state
+    if 'refresh_token' in ss:
+        payload = _decode_token(ss.refresh_token)
         if payload:
             # Validate device_id and IP match
             current_device_id = _get_or_generate_device_id()
             current_ip = _get_client_ip()
-            token_device_id = payload.get('device_id')
-            token_client_ip = payload.get('client_ip')
-            
-            if token_device_id != current_device_id or token_client_ip != current_ip:
+            if not _binding_matches(payload, current_device_id, current_ip):
                 return False
             
             # Generate new access token with same device_id and client_ip
@@ -290,32 +356,41 @@ def refresh_access_token():
                 payload['email'],
                 payload['device_id'],
                 payload['client_ip'],
-                ACCESS_TOKEN_EXPIRY
+                _ACCESS_EXPIRY_S
             )
-            st.session_state.access_token = access_token
+            ss.access_token = access_token
             return True
     return False
 
 def debug_auth_status():
     """Debug function to show current authentication status"""
+    ss = st.session_state
     debug_info = {
-        'session_state_user_id': st.session_state.get('user_id'),
-        'session_state_username': st.session_state.get('username'),
-        'session_state_email': st.session_state.get('email'),
-        'device_id': st.session_state.get('device_id', 'Not generated yet'),
-        'client_ip': st.session_state.get('client_ip', 'Not detected yet'),
-        'has_access_token': 'access_token' in st.session_state and st.session_state.access_token is not None,
-        'has_refresh_token': 'refresh_token' in st.session_state and st.session_state.refresh_token is not None,
+        'session_state_user_id': ss.get('user_id'),
+        'session_state_username': ss.get('username'),
+        'session_state_email': ss.get('email'),
+        'device_id': ss.get('device_id', 'Not generated yet'),
+        'client_ip': ss.get('client_ip', 'Not detected yet'),
+        'has_access_token': 'access_token' in ss and ss.access_token is not None,
+        'has_refresh_token': 'refresh_token' in ss and ss.refresh_token is not None,
         'is_logged_in': is_logged_in()
     }
     
     # If we have tokens, check device_id and IP binding
-    if st.session_state.get('access_token'):
-        payload = _decode_token(st.session_state.access_token)
-        if payload:
-            debug_info['token_device_id'] = payload.get('device_id')
-            debug_info['token_client_ip'] = payload.get('client_ip')
-            debug_info['device_match'] = payload.get('device_id') == st.session_state.get('device_id')
-            debug_info['ip_match'] = payload.get('client_ip') == st.session_state.get('client_ip')
+    access_token = ss.get('access_token')
+    if access_token:
+        verified = ss.get('_auth_verified')
+        if verified and verified[0] == access_token and verified[3] > time.time():
+            # is_logged_in just verified this token - reuse its device/IP claims
+            claims = verified[1:3]
+        else:
+            payload = _decode_token(access_token)
+            claims = (payload.get('device_id'), payload.get('client_ip')) if payload else None
+        if claims:
+            token_device_id, token_client_ip = claims
+            debug_info['token_device_id'] = token_device_id
+            debug_info['token_client_ip'] = token_client_ip
+            debug_info['device_match'] = token_device_id == ss.get('device_id')
+            debug_info['ip_match'] = token_client_ip == ss.get('client_ip')
     
     return debug_info
@@ -1,98 +1,127 @@
 """Chart Utilities using Plotly"""
-import plotly.graph_objects as go
-import plotly.express as px
+from __future__ import annotations
+
 import pandas as pd
-from typing import Dict, List, Optional
+import streamlit as st
+from typing import TYPE_CHECKING, Dict, List
+
+# Plotly is imported inside each plot_* function so pages that never chart skip its import cost
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
+# Figures are rebuilt only when their inputs change; unrelated widget reruns hit the cache
+CHART_CACHE_TTL = 300
 
+def _frame_key(df: pd.DataFrame):
+    """Cheap cache key for a price history: length plus the latest row"""
+    if df.empty:
+        return (0,)
+    return (len(df), df.index[-1], tuple(df.iloc[-1]))
+
+_chart_cache = st.cache_data(ttl=CHART_CACHE_TTL, show_spinner=False, hash_funcs={pd.DataFrame: _frame_key})
+
+@_chart_cache
 def plot_price_chart(stock_data: Dict) -> go.Figure:
     """Plot price chart with candlesticks"""
+    import plotly.graph_objects as go
+    
     if not stock_data or 'historical' not in stock_data:
         return go.Figure()
     
     hist = stock_data['historical']
     
     # Alpha Vantage uses lowercase column names
-    fig = go.Figure(data=[go.Candlestick(
-        x=hist.index,
-        open=hist['open'],
-        high=hist['high'],
-        low=hist['low'],
-        close=hist['close']
-    )])
-    
-    fig.update_layout(
-        title=f"{stock_data.get('name', 'Stock')} Price Chart",
-        xaxis_title="Date",
-        yaxis_title="Price (USD)",
-        template="plotly_dark",
-        height=400
+    fig = go.Figure(
+        data=[go.Candlestick(
+            x=hist.index,
+            open=hist['open'],
+            high=hist['high'],
+            low=hist['low'],
+            close=hist['close']
+        )],
+        layout=go.Layout(
+            title=f"{stock_data.get('name', 'Stock')} Price Chart",
+            xaxis_title="Date",
+            yaxis_title="Price (USD)",
+            template="plotly_dark",
+            height=400
+        )
     )
     
     return fig
 
+@_chart_cache
 def plot_portfolio_allocation(holdings: List[Dict]) -> go.Figure:
     """Plot portfolio allocation pie chart"""
+    import plotly.graph_objects as go
+    
     if not holdings:
         return go.Figure()
     
-    labels = [h['name'] for h in holdings]
-    # Use 'current_value' if available, otherwise fall back to 'value'
-    values = [h.get('current_value', h.get('value', 0)) for h in holdings]
-    
-    fig = go.Figure(data=[go.Pie(
-        labels=labels,
-        values=values,
-        hole=0.4
-    )])
-    
-    fig.update_layout(
-        title="Portfolio Allocation",
-        template="plotly_dark",
-        height=400
+    labels = []
+    values = []
+    for h in holdings:
+        labels.append(h['name'])
+        # Use 'current_value' if available, otherwise fall back to 'value'
+        value = h.get('current_value')
+        values.append(value if value is not None else h.get('value', 0))
+    
+    fig = go.Figure(
+        data=[go.Pie(
+            labels=labels,
+            values=values,
+            hole=0.4
+        )],
+        layout=go.Layout(
+            title="Portfolio Allocation",
+            template="plotly_dark",
+            height=400
+        )
     )
     
     return fig
 
+@_chart_cache
 def plot_returns_comparison(all_stock_data: Dict[str, Dict]) -> go.Figure:
     """Plot returns comparison bar chart"""
+    import plotly.graph_objects as go
+    
     if not all_stock_data:
         return go.Figure()
     
-    data = []
+    # One list per column, filled in a single pass
+    stocks, r1m, r3m, r6m, r1y = [], [], [], [], []
     for ticker, stock_data in all_stock_data.items():
         if stock_data:
-            data.append({
-                'Stock': stock_data.get('name', ticker),
-                '1M Return %': stock_data.get('returns_1m', 0),
-                '3M Return %': stock_data.get('returns_3m', 0),
-                '6M Return %': stock_data.get('returns_6m', 0),
-                '1Y Return %': stock_data.get('returns_1y', 0)
-            })
-    
-    df = pd.DataFrame(data)
-    
-    fig = go.Figure()
-    
-    for period in ['1M Return %', '3M Return %', '6M Return %', '1Y Return %']:
-        fig.add_trace(go.Bar(
-            name=period,
-            x=df['Stock'],
-            y=df[period]
-        ))
-    
-    fig.update_layout(
-        title="Stock Returns Comparison",
-        xaxis_title="Stock",
-        yaxis_title="Return (%)",
-        template="plotly_dark",
-        barmode='group',
-        height=500
+            stocks.append(stock_data.get('name', ticker))
+            r1m.append(stock_data.get('returns_1m', 0))
+            r3m.append(stock_data.get('returns_3m', 0))
+            r6m.append(stock_data.get('returns_6m', 0))
+            r1y.append(stock_data.get('returns_1y', 0))
+    
+    # Plotly takes the lists directly - no DataFrame needed
+    fig = go.Figure(
+        data=[
+            go.Bar(name=period, x=stocks, y=returns)
+            for period, returns in (('1M Return %', r1m), ('3M Return %', r3m), ('6M Return %', r6m), ('1Y Return %', r1y))
+        ],
+        layout=go.Layout(
+            title="Stock Returns Comparison",
+            xaxis_title="Stock",
+            yaxis_title="Return (%)",
+            template="plotly_dark",
+            barmode='group',
+            height=500
+        )
     )
     
     return fig
 
+@_chart_cache
 def plot_volatility_comparison(all_stock_data: Dict[str, Dict]) -> go.Figure:
     """Plot volatility comparison"""
+    import plotly.graph_objects as go
+    
     if not all_stock_data:
         return go.Figure()
     
@@ -104,18 +133,19 @@ def plot_volatility_comparison(all_stock_data: Dict[str, Dict]) -> go.Figure:
             stocks.append(stock_data.get('name', ticker))
             volatilities.append(stock_data.get('volatility', 0))
     
-    fig = go.Figure(data=[go.Bar(
-        x=stocks,
-        y=volatilities,
-        marker_color='purple'
-    )])
-    
-    fig.update_layout(
-        title="Stock Volatility Comparison",
-        xaxis_title="Stock",
-        yaxis_title="Volatility (%)",
-        template="plotly_dark",
-        height=400
+    fig = go.Figure(
+        data=[go.Bar(
+            x=stocks,
+            y=volatilities,
+            marker_color='purple'
+        )],
+        layout=go.Layout(
+            title="Stock Volatility Comparison",
+            xaxis_title="Stock",
+            yaxis_title="Volatility (%)",
+            template="plotly_dark",
+            height=400
+        )
     )
     
     return fig
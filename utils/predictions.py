@@ -5,13 +5,57 @@ import pandas as pd
 import numpy as np
 from typing import Dict, Tuple, List, Optional
 from datetime import datetime, timedelta
+import hashlib
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import warnings
+from utils._njit import NUMBA_AVAILABLE, njit
+
+# joblib (shipped with scikit-learn) fans the ARIMA order search out across cores; optional
+try:
+    from joblib import Parallel, delayed
+    JOBLIB_AVAILABLE = True
+except ImportError:
+    JOBLIB_AVAILABLE = False
+
+# scipy's lfilter runs the EMA recursions in C without building pandas objects; optional
+try:
+    from scipy.signal import lfilter
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+# statsmodels powers ARIMA; imported once here rather than on every forecast call
+try:
+    from statsmodels.tsa.arima.model import ARIMA
+except ImportError:
+    ARIMA = None
 
 # Suppress statsmodels convergence warnings
 warnings.filterwarnings('ignore', category=UserWarning, module='statsmodels')
 warnings.filterwarnings('ignore', message='Maximum Likelihood optimization failed to converge')
 warnings.filterwarnings('ignore')
 
+# Fitted sub-model results, keyed by (model, price-history digest, horizon); LRU-evicted and
+# expired after MODEL_CACHE_TTL seconds. Values are (stored_at, result) pairs
+MODEL_CACHE_SIZE = 128
+MODEL_CACHE_TTL = 900
+_model_cache = OrderedDict()
+_model_cache_lock = threading.Lock()
+
+# Trading signals ordered from most bearish to most bullish; index = level + 2
+RECOMMENDATIONS = ('STRONG SELL', 'SELL', 'HOLD', 'BUY', 'STRONG BUY')
+SIGNAL_LEVELS = {signal: level - 2 for level, signal in enumerate(RECOMMENDATIONS)}
+
+# ARIMA (p, d, q) candidates searched by auto_arima_prediction, cheapest (lowest p+d+q) first
+ARIMA_ORDERS = tuple(sorted(itertools.product(range(0, 3), range(0, 2), range(0, 3)), key=sum))
+
+# ARIMA fits on the last ~6 months of closes
+ARIMA_HISTORY_DAYS = 126
+
 def calculate_moving_averages(df: pd.DataFrame, periods: List[int] = [5, 10, 20, 50, 200]) -> Dict[str, pd.Series]:
     """Calculate multiple moving averages for trend analysis"""
     ma_dict = {}
@@ -20,122 +64,322 @@ def calculate_moving_averages(df: pd.DataFrame, periods: List[int] = [5, 10, 20,
             ma_dict[f'MA_{period}'] = df['close'].rolling(window=period).mean()
     return ma_dict
 
+def _column_array(df: pd.DataFrame, column: str) -> np.ndarray:
+    """A price column as a contiguous float64 array (no copy when it already is one)"""
+    return np.ascontiguousarray(df[column].to_numpy(), dtype=np.float64)
+
+@njit(cache=True)
+def _wilder_averages(close: np.ndarray, period: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Wilder-smoothed average gain and loss (seeded with a simple mean of the first period)
+
+    A NaN close makes its deltas count as no movement (as the old where(...).rolling RSI did)
+    instead of poisoning every later average.
+    """
+    n = close.shape[0]
+    avg_gain = np.full(n, np.nan)
+    avg_loss = np.full(n, np.nan)
+    if n <= period:
+        return avg_gain, avg_loss
+    
+    gain = 0.0
+    loss = 0.0
+    for i in range(1, period + 1):
+        delta = close[i] - close[i - 1]
+        if delta > 0:
+            gain += delta
+        elif delta < 0:
+            loss -= delta
+    gain /= period
+    loss /= period
+    avg_gain[period] = gain
+    avg_loss[period] = loss
+    
+    for i in range(period + 1, n):
+        delta = close[i] - close[i - 1]
+        gain = (gain * (period - 1) + (delta if delta > 0 else 0.0)) / period
+        loss = (loss * (period - 1) + (-delta if delta < 0 else 0.0)) / period
+        avg_gain[i] = gain
+        avg_loss[i] = loss
+    return avg_gain, avg_loss
+
+def _rsi(close: np.ndarray, period: int = 14) -> np.ndarray:
+    """RSI values for a float64 close array"""
+    avg_gain, avg_loss = _wilder_averages(close, period)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = avg_gain / avg_loss
+        return 100 - (100 / (1 + rs))
+
 def calculate_rsi(df: pd.DataFrame, period: int = 14) -> pd.Series:
     """Calculate Relative Strength Index with Wilder's smoothing"""
-    delta = df['close'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-    
-    rs = gain / loss
-    rsi = 100 - (100 / (1 + rs))
-    return rsi
+    return pd.Series(_rsi(_column_array(df, 'close'), period), index=df.index)
+
+def _exp_smooth(values: np.ndarray, alpha: float) -> np.ndarray:
+    """Exponential smoothing, same recursion as pandas ewm(alpha=alpha, adjust=False)"""
+    # lfilter would carry a NaN into every later value; pandas skips gaps, so let it handle those
+    if not SCIPY_AVAILABLE or np.isnan(values).any():
+        return pd.Series(values).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+    if len(values) == 0:
+        return values
+    # y[t] = alpha * x[t] + (1 - alpha) * y[t-1], seeded so that y[0] = x[0]
+    return lfilter([alpha], [1.0, alpha - 1.0], values, zi=[(1.0 - alpha) * values[0]])[0]
+
+def _ema(values: np.ndarray, span: int) -> np.ndarray:
+    """Exponential moving average, same recursion as pandas ewm(span=span, adjust=False)"""
+    return _exp_smooth(values, 2.0 / (span + 1))
+
+def _macd(close: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """MACD line, signal line and histogram for a float64 close array"""
+    macd_line = _ema(close, fast) - _ema(close, slow)
+    signal_line = _ema(macd_line, signal)
+    return macd_line, signal_line, macd_line - signal_line
 
 def calculate_macd(df: pd.DataFrame, fast: int = 12, slow: int = 26, signal: int = 9) -> Dict[str, pd.Series]:
     """Calculate MACD with exponential moving averages"""
-    ema_fast = df['close'].ewm(span=fast, adjust=False).mean()
-    ema_slow = df['close'].ewm(span=slow, adjust=False).mean()
-    macd_line = ema_fast - ema_slow
-    signal_line = macd_line.ewm(span=signal, adjust=False).mean()
-    histogram = macd_line - signal_line
+    macd_line, signal_line, histogram = _macd(_column_array(df, 'close'), fast, slow, signal)
     
     return {
-        'macd': macd_line,
-        'signal': signal_line,
-        'histogram': histogram
+        'macd': pd.Series(macd_line, index=df.index),
+        'signal': pd.Series(signal_line, index=df.index),
+        'histogram': pd.Series(histogram, index=df.index)
     }
 
+# Windows whose std is below this fraction of their mean count as flat (std 0.0, as pandas reports)
+ROLLING_STD_REL_EPS = 1e-8
+
+@njit(cache=True)
+def _window_mean_m2(values: np.ndarray, end: int, period: int) -> Tuple[float, float]:
+    """Exact Welford mean and sum of squared deviations of values[end - period + 1:end + 1]"""
+    m = 0.0
+    m2 = 0.0
+    for j in range(period):
+        x = values[end - period + 1 + j]
+        d = x - m
+        m += d / (j + 1)
+        m2 += d * (x - m)
+    return m, m2
+
+@njit(cache=True)
+def _rolling_mean_std(values: np.ndarray, period: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Rolling mean and sample std (ddof=1) in one pass of sliding Welford updates
+
+    The running state is recomputed exactly every `period` outputs so rounding error
+    cannot accumulate, and windows of identical values report exactly 0.0.
+    """
+    n = values.shape[0]
+    mean = np.full(n, np.nan)
+    std = np.full(n, np.nan)
+    m = 0.0      # mean of the non-NaN values in the window
+    m2 = 0.0     # their sum of squared deviations from m
+    count = 0
+    run = 0      # length of the run of equal values ending at i
+    since_refresh = 0
+    for i in range(n):
+        x = values[i]
+        if np.isnan(x):
+            run = 0
+        else:
+            run = run + 1 if i > 0 and x == values[i - 1] else 1
+            count += 1
+            d = x - m
+            m += d / count
+            m2 += d * (x - m)
+        if i >= period:
+            old = values[i - period]
+            if not np.isnan(old):
+                count -= 1
+                if count == 0:
+                    m = 0.0
+                    m2 = 0.0
+                else:
+                    d = old - m
+                    m -= d / count
+                    m2 -= d * (old - m)
+        # Like pandas rolling, any NaN in the window leaves the output NaN
+        if i >= period - 1 and count == period:
+            since_refresh += 1
+            if since_refresh >= period:
+                m, m2 = _window_mean_m2(values, i, period)
+                since_refresh = 0
+            if run >= period:
+                mean[i] = x
+                if period > 1:
+                    std[i] = 0.0
+                continue
+            mean[i] = m
+            if period > 1:
+                s = np.sqrt(max(0.0, m2 / (period - 1)))
+                std[i] = 0.0 if s <= ROLLING_STD_REL_EPS * abs(m) else s
+    return mean, std
+
+def _bollinger(close: np.ndarray, period: int = 20, std_dev: float = 2) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Upper, middle, lower bands and bandwidth for a float64 close array"""
+    sma, std = _rolling_mean_std(close, period)
+    band = std * std_dev
+    return sma + band, sma, sma - band, 2 * band / sma
+
 def calculate_bollinger_bands(df: pd.DataFrame, period: int = 20, std_dev: float = 2) -> Dict[str, pd.Series]:
     """Calculate Bollinger Bands for volatility analysis"""
-    sma = df['close'].rolling(window=period).mean()
-    std = df['close'].rolling(window=period).std()
+    upper, middle, lower, bandwidth = _bollinger(_column_array(df, 'close'), period, std_dev)
     
     return {
-        'upper': sma + (std * std_dev),
-        'middle': sma,
-        'lower': sma - (std * std_dev),
-        'bandwidth': (sma + (std * std_dev) - (sma - (std * std_dev))) / sma
+        'upper': pd.Series(upper, index=df.index),
+        'middle': pd.Series(middle, index=df.index),
+        'lower': pd.Series(lower, index=df.index),
+        'bandwidth': pd.Series(bandwidth, index=df.index)
     }
 
+def _rolling_window(values: np.ndarray, window: int, reducer) -> np.ndarray:
+    """Apply a NumPy reduction over each trailing window, NaN-padded to the input length"""
+    out = np.full(len(values), np.nan)
+    if len(values) >= window:
+        out[window - 1:] = reducer(np.lib.stride_tricks.sliding_window_view(values, window), axis=1)
+    return out
+
+@njit(cache=True)
+def _rolling_extreme(values: np.ndarray, window: int, is_max: bool) -> np.ndarray:
+    """O(n) rolling min or max via a monotonic deque of indices (NaN if the window holds a NaN)"""
+    n = values.shape[0]
+    out = np.full(n, np.nan)
+    # Each index is pushed at most once, so a flat buffer with head/tail cursors suffices
+    queue = np.empty(n, dtype=np.int64)
+    head = 0
+    tail = 0
+    nan_count = 0
+    for i in range(n):
+        x = values[i]
+        if np.isnan(x):
+            nan_count += 1
+        else:
+            # Drop candidates the new value dominates
+            while tail > head and (values[queue[tail - 1]] <= x if is_max else values[queue[tail - 1]] >= x):
+                tail -= 1
+            queue[tail] = i
+            tail += 1
+        if i >= window and np.isnan(values[i - window]):
+            nan_count -= 1
+        # Evict the front once it falls out of the window
+        while tail > head and queue[head] <= i - window:
+            head += 1
+        if i >= window - 1 and nan_count == 0:
+            out[i] = values[queue[head]]
+    return out
+
+def _stochastic(high: np.ndarray, low: np.ndarray, close: np.ndarray, k_period: int = 14, d_period: int = 3) -> Tuple[np.ndarray, np.ndarray]:
+    """%K and %D for float64 high/low/close arrays"""
+    low_min = _rolling_extreme(low, k_period, False)
+    high_max = _rolling_extreme(high, k_period, True)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        k_percent = 100 * ((close - low_min) / (high_max - low_min))
+    d_percent = _rolling_window(k_percent, d_period, np.mean)
+    return k_percent, d_percent
+
 def calculate_stochastic(df: pd.DataFrame, k_period: int = 14, d_period: int = 3) -> Dict[str, pd.Series]:
     """Calculate Stochastic Oscillator"""
-    low_min = df['low'].rolling(window=k_period).min()
-    high_max = df['high'].rolling(window=k_period).max()
-    
-    k_percent = 100 * ((df['close'] - low_min) / (high_max - low_min))
-    d_percent = k_percent.rolling(window=d_period).mean()
+    k_percent, d_percent = _stochastic(
+        _column_array(df, 'high'), _column_array(df, 'low'), _column_array(df, 'close'), k_period, d_period
+    )
     
     return {
-        'k_percent': k_percent,
-        'd_percent': d_percent
+        'k_percent': pd.Series(k_percent, index=df.index),
+        'd_percent': pd.Series(d_percent, index=df.index)
     }
 
+def _fit_arima_aic(data: np.ndarray, order: Tuple[int, int, int]) -> Tuple[Tuple[int, int, int], float]:
+    """Fit one ARIMA order and return it with its AIC (inf if the fit fails)"""
+    warnings.filterwarnings('ignore')  # worker processes don't inherit the filters
+    try:
+        # Add convergence parameters to avoid warnings
+        fitted_model = ARIMA(data, order=order).fit(method_kwargs={
+            'method': 'lbfgs',  # Use L-BFGS optimizer
+            'maxiter': 50,      # Limit iterations
+            'disp': False       # Suppress convergence messages
+        })
+        return order, fitted_model.aic
+    except Exception:
+        return order, float('inf')
+
 def auto_arima_prediction(df: pd.DataFrame, days_ahead: int = 30) -> Dict[str, float]:
     """Advanced ARIMA with automatic parameter selection (used by major banks)"""
     if len(df) < 50:
         return {'prediction': df['close'].iloc[-1], 'slope': 0, 'confidence': 0.5, 'model': 'Insufficient Data'}
     
     try:
-        from statsmodels.tsa.arima.model import ARIMA
-        from statsmodels.tsa.stattools import adfuller
-        from statsmodels.graphics.tsaplots import plot_acf, plot_pacf
+        if ARIMA is None:
+            raise ImportError('statsmodels is not installed')
         
         # Use more recent data for better accuracy
-        recent_data = df.tail(min(252, len(df)))['close'].values  # Use up to 1 year
-        
-        # Test for stationarity
-        adf_result = adfuller(recent_data)
-        is_stationary = adf_result[1] < 0.05
-        
-        # Auto-select ARIMA parameters based on AIC
-        best_aic = float('inf')
-        best_order = (1, 1, 1)
-        
-        # Test different parameter combinations with better convergence handling
-        for p in range(0, 3):  # Reduced range to avoid convergence issues
-            for d in range(0, 2):
-                for q in range(0, 3):
-                    try:
-                        model = ARIMA(recent_data, order=(p, d, q))
-                        # Add convergence parameters to avoid warnings
-                        fitted_model = model.fit(
-                            method='lbfgs',  # Use L-BFGS optimizer
-                            maxiter=50,      # Limit iterations
-                            disp=False       # Suppress convergence messages
-                        )
-                        if fitted_model.aic < best_aic:
-                            best_aic = fitted_model.aic
-                            best_order = (p, d, q)
-                    except Exception:
-                        continue
-        
-        # Fit best model with convergence parameters
-        model = ARIMA(recent_data, order=best_order)
-        fitted_model = model.fit(
-            method='lbfgs',
-            maxiter=100,
-            disp=False
-        )
-        
-        # Generate forecast with confidence intervals
-        forecast_result = fitted_model.get_forecast(steps=days_ahead)
-        forecast = forecast_result.predicted_mean
-        conf_int = forecast_result.conf_int()
+        recent_data = df.tail(min(ARIMA_HISTORY_DAYS, len(df)))['close'].values  # Use up to 6 months
+        
+        try:
+            from pmdarima import auto_arima
+        except (ImportError, ValueError):
+            # ValueError: a pmdarima wheel built against a different numpy ABI
+            auto_arima = None
+        
+        if auto_arima is not None:
+            # Stepwise (Hyndman-Khandakar) search: d comes from a KPSS unit-root test,
+            # then p and q walk the AIC surface instead of fitting every order
+            model = auto_arima(
+                recent_data,
+                start_p=0, start_q=0, max_p=2, max_q=2, max_d=1,
+                test='kpss',
+                seasonal=False,
+                stepwise=True,
+                information_criterion='aic',
+                suppress_warnings=True,
+                error_action='ignore',
+                maxiter=100
+            )
+            best_order = model.order
+            best_aic = model.aic()
+            forecast, conf_int = model.predict(n_periods=days_ahead, return_conf_int=True)
+            forecast = np.asarray(forecast)
+            conf_int = np.asarray(conf_int)
+        else:
+            # Auto-select ARIMA parameters based on AIC; the fits are independent,
+            # so run them in parallel when joblib is available
+            if JOBLIB_AVAILABLE:
+                results = Parallel(n_jobs=-1, prefer='processes')(
+                    delayed(_fit_arima_aic)(recent_data, order) for order in ARIMA_ORDERS
+                )
+            else:
+                results = [_fit_arima_aic(recent_data, order) for order in ARIMA_ORDERS]
+            
+            best_order, best_aic = min(results, key=lambda r: r[1])
+            if best_aic == float('inf'):
+                best_order = (1, 1, 1)
+            
+            # Fit best model with convergence parameters
+            model = ARIMA(recent_data, order=best_order)
+            fitted_model = model.fit(method_kwargs={
+                'method': 'lbfgs',
+                'maxiter': 100,
+                'disp': False
+            })
+            
+            # Generate forecast with confidence intervals
+            # (fitted on an ndarray, so the forecast and intervals come back as ndarrays)
+            forecast_result = fitted_model.get_forecast(steps=days_ahead)
+            forecast = np.asarray(forecast_result.predicted_mean)
+            conf_int = np.asarray(forecast_result.conf_int())
         
         # Calculate confidence based on prediction intervals
-        std_dev = np.mean((conf_int.iloc[:, 1] - conf_int.iloc[:, 0]) / 2)
+        std_dev = np.mean((conf_int[:, 1] - conf_int[:, 0]) / 2)
         confidence = max(0.4, min(0.9, 1 - (std_dev / np.mean(recent_data))))
         
         # Calculate trend
-        slope = (forecast.iloc[-1] - recent_data[-1]) / len(forecast)
+        slope = (forecast[-1] - recent_data[-1]) / len(forecast)
         
         return {
-            'prediction': forecast.iloc[-1],
+            'prediction': forecast[-1],
             'predictions': forecast.tolist(),
             'slope': slope,
             'confidence': confidence,
             'model': f'ARIMA{best_order}',
             'aic': best_aic,
-            'stationary': is_stationary
+            'stationary': None  # no ADF test; d comes from KPSS (pmdarima) or the AIC grid
         }
     except Exception as e:
         # Enhanced fallback with trend analysis
@@ -153,18 +397,57 @@ def auto_arima_prediction(df: pd.DataFrame, days_ahead: int = 30) -> Dict[str, f
             'stationary': False
         }
 
-def prophet_prediction(df: pd.DataFrame, days_ahead: int = 30) -> Dict[str, float]:
+def _neuralprophet_forecast(prophet_df: pd.DataFrame, days_ahead: int) -> Dict[str, float]:
+    """NeuralProphet forecast in the same shape as prophet_prediction (raises ImportError if missing)"""
+    from neuralprophet import NeuralProphet
+    
+    # 10%/90% quantiles match Prophet's default 80% uncertainty interval
+    model = NeuralProphet(
+        yearly_seasonality=True,
+        weekly_seasonality=True,
+        daily_seasonality=False,
+        seasonality_mode='multiplicative',
+        quantiles=[0.1, 0.9]
+    )
+    model.fit(prophet_df, freq='D', progress=None)
+    
+    # One historic row so the trend change spans the whole forecast horizon, as with Prophet
+    future = model.make_future_dataframe(prophet_df, periods=days_ahead, n_historic_predictions=1)
+    forecast = model.predict(future)
+    
+    prediction = forecast['yhat1'].iloc[-1]
+    interval_width = forecast['yhat1 90.0%'].iloc[-1] - forecast['yhat1 10.0%'].iloc[-1]
+    confidence = max(0.4, min(0.9, 1 - (interval_width / prediction)))
+    
+    return {
+        'prediction': prediction,
+        'predictions': forecast['yhat1'].tail(days_ahead).tolist(),
+        'confidence': confidence,
+        'model': 'NeuralProphet',
+        'trend': forecast['trend'].iloc[-1] - forecast['trend'].iloc[-days_ahead-1]
+    }
+
+def prophet_prediction(df: pd.DataFrame, days_ahead: int = 30, use_neuralprophet: bool = False) -> Dict[str, float]:
     """Facebook Prophet model for time series forecasting (used by major tech companies)"""
     if len(df) < 30:
         return {'prediction': df['close'].iloc[-1], 'confidence': 0.5, 'model': 'Insufficient Data'}
     
     try:
-        from prophet import Prophet
-        
         # Prepare data for Prophet
         prophet_df = df.reset_index()
         prophet_df = prophet_df[['date', 'close']].rename(columns={'date': 'ds', 'close': 'y'})
         
+        # Opt-in: NeuralProphet predicts faster but trains slower, and every call here refits
+        if use_neuralprophet:
+            try:
+                return _neuralprophet_forecast(prophet_df, days_ahead)
+            except ImportError:
+                pass  # Not installed - fall back to Prophet
+            except (KeyError, ValueError, TypeError, AttributeError, RuntimeError) as e:
+                print(f"NeuralProphet forecast failed, falling back to Prophet: {str(e)}")
+        
+        from prophet import Prophet
+        
         # Initialize Prophet with financial market settings
         model = Prophet(
             yearly_seasonality=True,
@@ -172,7 +455,8 @@ def prophet_prediction(df: pd.DataFrame, days_ahead: int = 30) -> Dict[str, floa
             daily_seasonality=False,
             seasonality_mode='multiplicative',
             changepoint_prior_scale=0.05,  # Conservative for financial data
-            seasonality_prior_scale=10.0
+            seasonality_prior_scale=10.0,
+            uncertainty_samples=100  # Enough draws for the interval width used below
         )
         
         # Fit model
@@ -243,12 +527,10 @@ def holt_winters_prediction(df: pd.DataFrame, days_ahead: int = 30) -> Dict[str,
         }
     except Exception as e:
         # Simple exponential smoothing fallback
-        recent_data = df.tail(min(60, len(df)))['close'].values
+        recent_data = df.tail(min(60, len(df)))['close'].to_numpy(dtype=np.float64)
         alpha = 0.3
         
-        smoothed = [recent_data[0]]
-        for i in range(1, len(recent_data)):
-            smoothed.append(alpha * recent_data[i] + (1 - alpha) * smoothed[i-1])
+        smoothed = _exp_smooth(recent_data, alpha)
         
         trend = (smoothed[-1] - smoothed[-min(10, len(smoothed))]) / min(10, len(smoothed))
         prediction = smoothed[-1] + (trend * days_ahead)
@@ -270,12 +552,19 @@ def lstm_prediction(df: pd.DataFrame, days_ahead: int = 30) -> Dict[str, float]:
         import tensorflow as tf
         from tensorflow.keras.models import Sequential
         from tensorflow.keras.layers import LSTM, Dense, Dropout
+        from tensorflow.keras import mixed_precision
         from sklearn.preprocessing import MinMaxScaler
         
-        # Prepare data
+        # float16 compute on GPU tensor cores; on CPU mixed precision only slows things down.
+        # Set per layer, not via set_global_policy: this runs in ensemble worker threads and
+        # the global policy would leak into every model built afterwards, on any thread
+        use_mixed = bool(tf.config.list_physical_devices('GPU'))
+        layer_dtype = mixed_precision.Policy('mixed_float16') if use_mixed else 'float32'
+        
+        # Prepare data (float32 end to end - Keras would otherwise cast float64 inputs every batch)
         data = df['close'].values.reshape(-1, 1)
         scaler = MinMaxScaler()
-        scaled_data = scaler.fit_transform(data)
+        scaled_data = scaler.fit_transform(data).astype(np.float32)
         
         # Create sequences
         def create_sequences(data, seq_length=20):
@@ -294,25 +583,34 @@ def lstm_prediction(df: pd.DataFrame, days_ahead: int = 30) -> Dict[str, float]:
         
         # Build LSTM model
         model = Sequential([
-            LSTM(50, return_sequences=True, input_shape=(X.shape[1], 1)),
-            Dropout(0.2),
-            LSTM(50, return_sequences=False),
-            Dropout(0.2),
-            Dense(25),
-            Dense(1)
+            LSTM(50, return_sequences=True, input_shape=(X.shape[1], 1), dtype=layer_dtype),
+            Dropout(0.2, dtype=layer_dtype),
+            LSTM(50, return_sequences=False, dtype=layer_dtype),
+            Dropout(0.2, dtype=layer_dtype),
+            Dense(25, dtype=layer_dtype),
+            Dense(1, dtype='float32')  # Keep the output layer in float32 for a stable loss
         ])
         
-        model.compile(optimizer='adam', loss='mse')
+        # Keras only adds loss scaling on its own under a global mixed policy
+        optimizer = tf.keras.optimizers.Adam()
+        if use_mixed:
+            optimizer = mixed_precision.LossScaleOptimizer(optimizer)
+        model.compile(optimizer=optimizer, loss='mse')
         
         # Train model
         model.fit(X_train, y_train, epochs=20, batch_size=32, verbose=0)
         
+        # Compiled single-sample inference: skips predict()'s per-call data-adapter setup
+        @tf.function(input_signature=[tf.TensorSpec((1, 20, 1), tf.float32)])
+        def predict_step(x):
+            return model(x, training=False)
+        
         # Make prediction
         last_sequence = scaled_data[-20:].reshape(1, 20, 1)
         predictions = []
         
         for _ in range(days_ahead):
-            pred = model.predict(last_sequence, verbose=0)
+            pred = predict_step(tf.constant(last_sequence)).numpy()
             predictions.append(pred[0, 0])
             # Update sequence
             last_sequence = np.append(last_sequence[:, 1:, :], pred.reshape(1, 1, 1), axis=1)
@@ -336,6 +634,19 @@ def lstm_prediction(df: pd.DataFrame, days_ahead: int = 30) -> Dict[str, float]:
     except Exception as e:
         return {'prediction': df['close'].iloc[-1], 'confidence': 0.5, 'model': f'LSTM Error: {str(e)}'}
 
+# Serial on purpose: this runs in ensemble worker threads, and numba's default
+# workqueue threading layer aborts the process if parallel kernels overlap
+@njit(cache=True)
+def _simulate_final_prices(drift: float, volatility: float, start_price: float, simulations: int, days: int) -> np.ndarray:
+    """Final price of each GBM path"""
+    finals = np.empty(simulations)
+    for i in range(simulations):
+        price = start_price
+        for _ in range(days):
+            price *= 1.0 + np.random.normal(drift, volatility)
+        finals[i] = price
+    return finals
+
 def monte_carlo_simulation(df: pd.DataFrame, days_ahead: int = 30, simulations: int = 1000) -> Dict[str, float]:
     """Monte Carlo simulation for risk assessment (used by risk management)"""
     if len(df) < 30:
@@ -349,18 +660,16 @@ def monte_carlo_simulation(df: pd.DataFrame, days_ahead: int = 30, simulations:
         drift = returns.mean()
         volatility = returns.std()
         
-        # Monte Carlo simulation
-        simulations_results = []
+        # Monte Carlo simulation (Geometric Brownian Motion); only final prices are kept
         current_price = df['close'].iloc[-1]
         
-        for _ in range(simulations):
-            price_path = [current_price]
-            for _ in range(days_ahead):
-                # Geometric Brownian Motion
-                shock = np.random.normal(drift, volatility)
-                price = price_path[-1] * (1 + shock)
-                price_path.append(price)
-            simulations_results.append(price_path[-1])
+        if NUMBA_AVAILABLE:
+            simulations_results = _simulate_final_prices(drift, volatility, float(current_price), simulations, days_ahead)
+        else:
+            # Draw every daily shock at once and compound along each path
+            rng = np.random.default_rng()
+            shocks = rng.normal(drift, volatility, size=(simulations, days_ahead))
+            simulations_results = current_price * np.prod(1.0 + shocks, axis=1)
         
         # Calculate statistics
         mean_prediction = np.mean(simulations_results)
@@ -386,22 +695,66 @@ def monte_carlo_simulation(df: pd.DataFrame, days_ahead: int = 30, simulations:
     except Exception as e:
         return {'prediction': df['close'].iloc[-1], 'confidence': 0.5, 'model': f'Monte Carlo Error: {str(e)}'}
 
+def _history_digest(df: pd.DataFrame) -> str:
+    """Digest of the close prices and their dates - identifies a price history for caching"""
+    row_hashes = pd.util.hash_pandas_object(df['close'], index=True).to_numpy()
+    return hashlib.blake2b(row_hashes.tobytes(), digest_size=16).hexdigest()
+
+def _is_failed_result(result: Dict) -> bool:
+    """True for the error results the model functions return instead of raising"""
+    return 'error' in result or 'Error' in result.get('model', '')
+
+def _cached_model_result(key: Tuple[str, str, int]) -> Optional[Dict]:
+    """Look up an unexpired fitted sub-model result, marking it most recently used"""
+    with _model_cache_lock:
+        entry = _model_cache.get(key)
+        if entry is None:
+            return None
+        stored_at, result = entry
+        if time.monotonic() - stored_at > MODEL_CACHE_TTL:
+            del _model_cache[key]
+            return None
+        _model_cache.move_to_end(key)
+        return result
+
+def _store_model_result(key: Tuple[str, str, int], result: Dict):
+    """Remember a successful sub-model result, evicting the least recently used beyond MODEL_CACHE_SIZE"""
+    if _is_failed_result(result):
+        return  # Transient failures must not pin the model out of the ensemble
+    with _model_cache_lock:
+        _model_cache[key] = (time.monotonic(), result)
+        _model_cache.move_to_end(key)
+        while len(_model_cache) > MODEL_CACHE_SIZE:
+            _model_cache.popitem(last=False)
+
 def ensemble_prediction(df: pd.DataFrame, days_ahead: int = 30) -> Dict[str, float]:
     """Ensemble method combining multiple models (industry best practice)"""
     if len(df) < 30:
         return {'error': 'Insufficient data for ensemble forecasting'}
     
-    # Get predictions from all models
-    models = {
-        'arima': auto_arima_prediction(df, days_ahead),
-        'prophet': prophet_prediction(df, days_ahead),
-        'holt_winters': holt_winters_prediction(df, days_ahead),
-        'lstm': lstm_prediction(df, days_ahead),
-        'monte_carlo': monte_carlo_simulation(df, days_ahead)
+    # Get predictions from all models; they are independent and their heavy
+    # lifting (statsmodels, Stan, TensorFlow, numpy) releases the GIL, so fit them concurrently
+    model_fns = {
+        'arima': auto_arima_prediction,
+        'prophet': prophet_prediction,
+        'holt_winters': holt_winters_prediction,
+        'lstm': lstm_prediction,
+        'monte_carlo': monte_carlo_simulation
     }
+    # Fits only change when the price history does, so reuse results from earlier reruns
+    digest = _history_digest(df)
+    models = {name: _cached_model_result((name, digest, days_ahead)) for name in model_fns}
+    missing = [name for name, result in models.items() if result is None]
+    
+    if missing:
+        with ThreadPoolExecutor(max_workers=len(missing)) as executor:
+            futures = {name: executor.submit(model_fns[name], df, days_ahead) for name in missing}
+            for name, future in futures.items():
+                models[name] = future.result()
+                _store_model_result((name, digest, days_ahead), models[name])
     
     # Filter out models with errors
-    valid_models = {k: v for k, v in models.items() if 'error' not in v and 'Error' not in v.get('model', '')}
+    valid_models = {k: v for k, v in models.items() if not _is_failed_result(v)}
     
     if not valid_models:
         return {'error': 'No valid models available'}
@@ -419,26 +772,24 @@ def ensemble_prediction(df: pd.DataFrame, days_ahead: int = 30) -> Dict[str, flo
     for name in weights:
         weights[name] /= total_weight
     
+    # Stack the models as rows so each weighted sum is one matrix-vector product
+    names = list(valid_models)
+    weight_vector = np.array([weights[name] for name in names])
+    
     # Calculate ensemble prediction
-    ensemble_prediction_value = sum(
-        result['prediction'] * weights[name] 
-        for name, result in valid_models.items()
-    )
+    ensemble_prediction_value = weight_vector @ np.array([valid_models[name]['prediction'] for name in names], dtype=np.float64)
     
     # Calculate ensemble confidence
-    ensemble_confidence = sum(
-        result.get('confidence', 0.5) * weights[name] 
-        for name, result in valid_models.items()
-    )
+    ensemble_confidence = weight_vector @ np.array([valid_models[name].get('confidence', 0.5) for name in names], dtype=np.float64)
     
-    # Calculate ensemble predictions array
-    ensemble_predictions = []
-    for i in range(days_ahead):
-        pred_value = sum(
-            result.get('predictions', [result['prediction']] * days_ahead)[i] * weights[name]
-            for name, result in valid_models.items()
-        )
-        ensemble_predictions.append(pred_value)
+    # Calculate ensemble predictions array (models without a path hold their final prediction flat)
+    prediction_paths = np.vstack([
+        np.asarray(valid_models[name]['predictions'], dtype=np.float64)[:days_ahead]
+        if 'predictions' in valid_models[name]
+        else np.full(days_ahead, valid_models[name]['prediction'], dtype=np.float64)
+        for name in names
+    ])
+    ensemble_predictions = (weight_vector @ prediction_paths).tolist()
     
     return {
         'prediction': ensemble_prediction_value,
@@ -446,7 +797,8 @@ def ensemble_prediction(df: pd.DataFrame, days_ahead: int = 30) -> Dict[str, flo
         'confidence': ensemble_confidence,
         'model': 'Ensemble',
         'models_used': list(valid_models.keys()),
-        'weights': weights
+        'weights': weights,
+        'strategies': valid_models
     }
 
 def advanced_trend_analysis(df: pd.DataFrame) -> Dict[str, any]:
@@ -454,25 +806,27 @@ def advanced_trend_analysis(df: pd.DataFrame) -> Dict[str, any]:
     if len(df) < 30:
         return {'direction': 'neutral', 'strength': 0.5, 'signal': 'HOLD'}
     
-    # Calculate multiple moving averages
-    ma_5 = df['close'].rolling(window=5).mean()
-    ma_10 = df['close'].rolling(window=10).mean()
-    ma_20 = df['close'].rolling(window=20).mean()
-    ma_50 = df['close'].rolling(window=50).mean()
+    close = _column_array(df, 'close')
+    volume = _column_array(df, 'volume')
+    
+    # Calculate multiple moving averages (only the latest value of each is used)
+    ma_5 = close[-5:].mean()
+    ma_10 = close[-10:].mean()
+    ma_20 = close[-20:].mean()
     
     # Calculate trend strength
-    current_price = df['close'].iloc[-1]
+    current_price = close[-1]
     trend_score = 0
     
     # Moving average alignment
-    if current_price > ma_5.iloc[-1] > ma_10.iloc[-1] > ma_20.iloc[-1]:
+    if current_price > ma_5 > ma_10 > ma_20:
         trend_score += 3
-    elif current_price < ma_5.iloc[-1] < ma_10.iloc[-1] < ma_20.iloc[-1]:
+    elif current_price < ma_5 < ma_10 < ma_20:
         trend_score -= 3
     
     # Price momentum
-    momentum_5 = (current_price - df['close'].iloc[-6]) / df['close'].iloc[-6] * 100
-    momentum_20 = (current_price - df['close'].iloc[-21]) / df['close'].iloc[-21] * 100
+    momentum_5 = (current_price - close[-6]) / close[-6] * 100
+    momentum_20 = (current_price - close[-21]) / close[-21] * 100
     
     if momentum_5 > 2 and momentum_20 > 5:
         trend_score += 2
@@ -480,8 +834,7 @@ def advanced_trend_analysis(df: pd.DataFrame) -> Dict[str, any]:
         trend_score -= 2
     
     # Volume analysis
-    avg_volume = df['volume'].rolling(window=20).mean()
-    volume_ratio = df['volume'].iloc[-1] / avg_volume.iloc[-1]
+    volume_ratio = volume[-1] / volume[-20:].mean()
     
     if volume_ratio > 1.5 and trend_score > 0:
         trend_score += 1
@@ -522,18 +875,19 @@ def generate_forecast(stock_data: Dict, days_ahead: int = 30) -> Dict[str, any]:
     if not stock_data or 'historical' not in stock_data:
         return {'error': 'No historical data available'}
     
-    df = stock_data['historical'].copy()
+    df = stock_data['historical']
     
     if len(df) < 20:
         return {'error': 'Insufficient data for forecasting (minimum 20 days required)'}
     
     try:
-        # Calculate technical indicators
-        ma_values = calculate_moving_averages(df)
-        rsi = calculate_rsi(df)
-        macd_values = calculate_macd(df)
-        bollinger = calculate_bollinger_bands(df)
-        stochastic = calculate_stochastic(df)
+        # Pull the price columns out once as contiguous float64 arrays and
+        # compute the technical indicators on those (only their latest values are reported)
+        close = _column_array(df, 'close')
+        rsi = _rsi(close)
+        _, _, macd_histogram = _macd(close)
+        bollinger_upper, _, bollinger_lower, _ = _bollinger(close)
+        k_percent, _ = _stochastic(_column_array(df, 'high'), _column_array(df, 'low'), close)
         
         # Get ensemble prediction
         ensemble_result = ensemble_prediction(df, days_ahead)
@@ -551,30 +905,15 @@ def generate_forecast(stock_data: Dict, days_ahead: int = 30) -> Dict[str, any]:
         # Calculate price change
         price_change = ((ensemble_final - current_price) / current_price) * 100
         
-        # Determine recommendation based on ensemble and trend analysis
-        if price_change > 8 and trend_info['signal'] in ['STRONG BUY', 'BUY']:
-            recommendation = 'STRONG BUY'
-        elif price_change > 3 and trend_info['signal'] in ['BUY', 'STRONG BUY']:
-            recommendation = 'BUY'
-        elif price_change < -8 and trend_info['signal'] in ['STRONG SELL', 'SELL']:
-            recommendation = 'STRONG SELL'
-        elif price_change < -3 and trend_info['signal'] in ['SELL', 'STRONG SELL']:
-            recommendation = 'SELL'
-        else:
-            recommendation = 'HOLD'
-        
-        # Get individual model results for display
-        individual_models = {
-            'arima': auto_arima_prediction(df, days_ahead),
-            'prophet': prophet_prediction(df, days_ahead),
-            'holt_winters': holt_winters_prediction(df, days_ahead),
-            'lstm': lstm_prediction(df, days_ahead),
-            'monte_carlo': monte_carlo_simulation(df, days_ahead)
-        }
+        # Determine recommendation based on ensemble and trend analysis: the
+        # forecast sets the strength (beyond +/-3% or +/-8%), but only when the trend agrees in direction
+        change = float(price_change)  # Python bools add as ints; numpy bools don't
+        price_level = (change > 3) + (change > 8) - (change < -3) - (change < -8)
+        trend_level = SIGNAL_LEVELS.get(trend_info['signal'], 0)
+        recommendation = RECOMMENDATIONS[price_level * (price_level * trend_level > 0) + 2]
         
-        # Filter valid models
-        valid_models = {k: v for k, v in individual_models.items() 
-                       if 'error' not in v and 'Error' not in v.get('model', '')}
+        # Individual model results for display - already fitted and filtered by the ensemble
+        valid_models = ensemble_result['strategies']
         
         return {
             'current_price': current_price,
@@ -584,11 +923,11 @@ def generate_forecast(stock_data: Dict, days_ahead: int = 30) -> Dict[str, any]:
             'average_change_percent': price_change,
             'recommendation': recommendation,
             'trend': trend_info,
-            'rsi': rsi.iloc[-1] if len(rsi) > 0 else 50,
-            'rsi_signal': 'OVERBOUGHT' if rsi.iloc[-1] > 70 else 'OVERSOLD' if rsi.iloc[-1] < 30 else 'NEUTRAL',
-            'macd_signal': 'BULLISH' if macd_values['histogram'].iloc[-1] > 0 else 'BEARISH',
-            'bollinger_position': 'UPPER' if current_price > bollinger['upper'].iloc[-1] else 'LOWER' if current_price < bollinger['lower'].iloc[-1] else 'MIDDLE',
-            'stochastic_signal': 'OVERBOUGHT' if stochastic['k_percent'].iloc[-1] > 80 else 'OVERSOLD' if stochastic['k_percent'].iloc[-1] < 20 else 'NEUTRAL',
+            'rsi': rsi[-1] if len(rsi) > 0 else 50,
+            'rsi_signal': 'OVERBOUGHT' if rsi[-1] > 70 else 'OVERSOLD' if rsi[-1] < 30 else 'NEUTRAL',
+            'macd_signal': 'BULLISH' if macd_histogram[-1] > 0 else 'BEARISH',
+            'bollinger_position': 'UPPER' if current_price > bollinger_upper[-1] else 'LOWER' if current_price < bollinger_lower[-1] else 'MIDDLE',
+            'stochastic_signal': 'OVERBOUGHT' if k_percent[-1] > 80 else 'OVERSOLD' if k_percent[-1] < 20 else 'NEUTRAL',
             'days_ahead': days_ahead,
             'models_used': len(valid_models),
             'confidence': ensemble_result.get('confidence', 0.5)